@@ -1,14 +1,16 @@
+import bisect
+import collections
+import math
 import os
 import re
-from datetime import datetime
-import filedate
+from datetime import datetime, timedelta
 import shutil
-import uuid
-import string
+import sys
 import time
-from pathlib import Path
-from PIL import Image, ExifTags
-from PIL.ExifTags import TAGS, GPSTAGS
+from array import array
+
+# Pillow, filedate and NumPy are imported inside the functions that use them,
+# so --help, video-only trees and short jobs don't pay for loading them
 
 # Define patterns for date extraction from filenames - with full datetime support
 DATE_PATTERNS = [
@@ -49,15 +51,30 @@ IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic', '.bmp', '.tiff', '.tif', '
 VIDEO_EXTENSIONS = {'.mov', '.mp4', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.m4v', '.3gp'}  # .mov jest tutaj
 ALL_EXTENSIONS = IMAGE_EXTENSIONS.union(VIDEO_EXTENSIONS)
 
-def get_gps_info(exif_data):
+# EXIF tags actually used by the organizer - everything else is skipped when reading records
+EXIF_TAGS_USED = {'Make', 'Model', 'GPSInfo'}
+
+# Sentinel stored in integer timestamp columns when a date is not available
+MISSING_TIMESTAMP = -(2 ** 63)
+
+def _silent(*args, **kwargs):
+    """
+    Drop-in replacement for print when running quietly
+    """
+    pass
+
+def get_gps_info(exif_data, verbose=True):
     """
     Extract GPS information from EXIF data
     Returns dictionary with GPS coordinates or None if no GPS data
     """
+    log = print if verbose else _silent
     try:
         if 'GPSInfo' not in exif_data:
             return None
         
+        from PIL.ExifTags import GPSTAGS
+        
         gps_info = {}
         gps_data = exif_data['GPSInfo']
         
@@ -67,20 +84,21 @@ def get_gps_info(exif_data):
             gps_info[tag_name] = value
         
         # Convert to decimal coordinates if possible
-        gps_coords = convert_gps_coordinates(gps_info)
+        gps_coords = convert_gps_coordinates(gps_info, verbose)
         if gps_coords:
             gps_info['decimal_coordinates'] = gps_coords
             gps_info['google_maps_url'] = f"https://maps.google.com/?q={gps_coords[0]},{gps_coords[1]}"
         
         return gps_info
     except Exception as e:
-        print(f"    ⚠ Error extracting GPS info: {e}")
+        log(f"    ⚠ Error extracting GPS info: {e}")
         return None
 
-def convert_gps_coordinates(gps_info):
+def convert_gps_coordinates(gps_info, verbose=True):
     """
     Convert GPS coordinates from EXIF format to decimal degrees
     """
+    log = print if verbose else _silent
     try:
         # GPSLatitude and GPSLongitude should be available
         if 'GPSLatitude' not in gps_info or 'GPSLongitude' not in gps_info:
@@ -111,211 +129,516 @@ def convert_gps_coordinates(gps_info):
         return (decimal_lat, decimal_lon)
         
     except Exception as e:
-        print(f"    ⚠ Error converting GPS coordinates: {e}")
+        log(f"    ⚠ Error converting GPS coordinates: {e}")
         return None
 
-def get_exif_metadata(image):
+def get_exif_metadata(image, tags=None, verbose=True):
     """
     Extract EXIF metadata from PIL Image including GPS data
+    If tags is given, only those tag names are kept
     """
+    log = print if verbose else _silent
     try:
+        from PIL.ExifTags import TAGS
+        
         exif_data = {}
-        if hasattr(image, '_getexif') and image._getexif() is not None:
-            for tag_id, value in image._getexif().items():
+        raw_exif = image._getexif() if hasattr(image, '_getexif') else None
+        if raw_exif is not None:
+            for tag_id, value in raw_exif.items():
                 tag = TAGS.get(tag_id, tag_id)
+                if tags is not None and tag not in tags:
+                    continue
                 exif_data[tag] = value
             
             # Extract GPS information
-            gps_info = get_gps_info(exif_data)
+            gps_info = get_gps_info(exif_data, verbose)
             if gps_info:
                 exif_data['GPSInfo'] = gps_info
                 
         return exif_data
     except Exception as e:
-        print(f"    ⚠ Error extracting EXIF: {e}")
+        log(f"    ⚠ Error extracting EXIF: {e}")
         return {}
 
-def display_camera_info(file_path):
+# Formats that carry EXIF data Pillow can read
+EXIF_EXTENSIONS = {'.jpg', '.jpeg', '.tiff', '.tif', '.png', '.webp'}
+
+def read_exif_summary(file_path, verbose=True):
     """
-    Display camera/model information from file metadata
+    Read only the EXIF tags the organizer uses, with a single open of the file
+    Returns (make, model, gps) - gps is (latitude, longitude) - with None for missing values
     """
+    make = model = gps = None
     try:
         file_ext = os.path.splitext(file_path)[1].lower()
         
-        if file_ext in ['.jpg', '.jpeg', '.tiff', '.tif', '.png', '.webp']:
+        if file_ext in EXIF_EXTENSIONS:
+            from PIL import Image
+            
             with Image.open(file_path) as img:
-                exif_data = get_exif_metadata(img)
-                
-                make = exif_data.get('Make', '')
-                model = exif_data.get('Model', '')
-                software = exif_data.get('Software', '')
-                
-                if make or model:
-                    camera_info = []
-                    if make:
-                        camera_info.append(str(make).strip())
-                    if model:
-                        camera_info.append(str(model).strip())
-                    
-                    if camera_info:
-                        return " / ".join(camera_info)
-        
-        return None
-        
+                exif_data = get_exif_metadata(img, EXIF_TAGS_USED, verbose)
+            
+            if exif_data.get('Make'):
+                make = str(exif_data['Make']).strip() or None
+            if exif_data.get('Model'):
+                model = str(exif_data['Model']).strip() or None
+            gps_info = exif_data.get('GPSInfo')
+            if isinstance(gps_info, dict):
+                gps = gps_info.get('decimal_coordinates')
     except Exception as e:
+        pass
+    
+    return make, model, gps
+
+def format_camera_info(make, model):
+    """
+    Camera description like 'SONY / ILCE-7M3', or None
+    """
+    camera_info = [part for part in (make, model) if part]
+    return " / ".join(camera_info) if camera_info else None
+
+def format_gps_coordinates(coords):
+    """
+    Coordinates like '52.229675°N, 21.012229°E', or None
+    """
+    if not coords:
         return None
+    lat, lon = coords
+    lat_dir = "N" if lat >= 0 else "S"
+    lon_dir = "E" if lon >= 0 else "W"
+    return f"{abs(lat):.6f}°{lat_dir}, {abs(lon):.6f}°{lon_dir}"
+
+def display_camera_info(file_path):
+    """
+    Display camera/model information from file metadata
+    """
+    make, model, gps = read_exif_summary(file_path)
+    return format_camera_info(make, model)
 
 def display_gps_info(file_path):
     """
     Display GPS/location information from file metadata
     """
-    try:
-        file_ext = os.path.splitext(file_path)[1].lower()
+    make, model, gps = read_exif_summary(file_path)
+    return format_gps_coordinates(gps)
+
+# Chunk size used by the throttled copy loop
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# How often the throttle control file is checked for changes, in seconds
+CONTROL_FILE_POLL_INTERVAL = 1.0
+
+SIZE_SUFFIXES = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parse_size(value):
+    """
+    Parse a byte count like 500K, 20M or 1G (binary units)
+    0 means unlimited
+    """
+    text = str(value).strip().upper()
+    if text.endswith('B'):
+        text = text[:-1]
+    suffix = text[-1:] if text[-1:] in SIZE_SUFFIXES else ''
+    number = text[:-1] if suffix else text
+    amount = float(number) * SIZE_SUFFIXES[suffix]
+    if not math.isfinite(amount) or amount < 0:
+        raise ValueError(f"size must be a finite non-negative number: {value}")
+    return int(amount)
+
+def parse_rate(value):
+    """
+    Parse an operations-per-second limit
+    0 means unlimited
+    """
+    rate = float(value)
+    if not math.isfinite(rate) or rate < 0:
+        raise ValueError(f"rate must be a finite non-negative number: {value}")
+    return rate
+
+def format_size(amount):
+    """
+    Human readable byte count
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(amount) < 1024 or unit == 'GB':
+            return f"{amount:.1f} {unit}" if unit != 'B' else f"{int(amount)} B"
+        amount /= 1024.0
+
+class TokenBucket:
+    """
+    Token bucket rate limiter
+    rate is tokens per second, 0 or None means unlimited
+    consume() may go into debt and then sleeps until the debt is paid
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = parse_rate(rate or 0)
+        self.capacity = burst or self.rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, rate, burst=None):
+        rate = parse_rate(rate or 0)
+        self._refill()
+        self.rate = rate
+        self.capacity = burst or self.rate
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, amount):
+        """
+        Take amount tokens, sleeping if the bucket runs dry
+        Returns seconds slept
+        """
+        if not self.rate:
+            return 0.0
+        self._refill()
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        wait = -self.tokens / self.rate
+        time.sleep(wait)
+        return wait
+
+class IOThrottle:
+    """
+    Bandwidth and IOPS limits shared by the copy engine and the probe stages
+    Limits can be changed while running through a control file with lines like:
+        max_bandwidth=20M
+        max_iops=200
+    The file is re-read when it changes, or right away after request_reload()
+    """
+
+    def __init__(self, max_bandwidth=0, max_iops=0, control_file=None):
+        self.bandwidth = TokenBucket(max_bandwidth)
+        self.iops = TokenBucket(max_iops)
+        self.control_file = control_file
+        self._control_mtime = None
+        self._next_poll = 0.0
+        self._reload_requested = False
+        self.bytes_transferred = 0
+        self.operations = 0
+        self.throttled_seconds = 0.0
+        self.started = time.monotonic()
+        self.check_control_file()
+
+    @property
+    def max_bandwidth(self):
+        return self.bandwidth.rate
+
+    @property
+    def max_iops(self):
+        return self.iops.rate
+
+    def request_reload(self):
+        """
+        Force the control file to be read on the next operation - safe to call from a signal handler
+        """
+        self._reload_requested = True
+
+    def check_control_file(self):
+        """
+        Apply limits from the control file if it changed since the last check
+        """
+        if not self.control_file:
+            return
+        now = time.monotonic()
+        if not self._reload_requested and now < self._next_poll:
+            return
+        self._next_poll = now + CONTROL_FILE_POLL_INTERVAL
+        force = self._reload_requested
+        self._reload_requested = False
         
-        if file_ext in ['.jpg', '.jpeg', '.tiff', '.tif', '.png', '.webp']:
-            with Image.open(file_path) as img:
-                exif_data = get_exif_metadata(img)
-                
-                if 'GPSInfo' in exif_data and 'decimal_coordinates' in exif_data['GPSInfo']:
-                    gps_data = exif_data['GPSInfo']
-                    coords = gps_data['decimal_coordinates']
-                    
-                    # Format coordinates for display
-                    lat = coords[0]
-                    lon = coords[1]
-                    lat_dir = "N" if lat >= 0 else "S"
-                    lon_dir = "E" if lon >= 0 else "W"
-                    
-                    return f"{abs(lat):.6f}°{lat_dir}, {abs(lon):.6f}°{lon_dir}"
+        try:
+            mtime = os.stat(self.control_file).st_mtime
+        except OSError:
+            return
+        if mtime == self._control_mtime and not force:
+            return
+        self._control_mtime = mtime
         
-        return None
+        try:
+            with open(self.control_file) as handle:
+                lines = handle.readlines()
+        except OSError as e:
+            print(f"  ⚠ Cannot read throttle control file {self.control_file}: {e}")
+            return
+        
+        # A bad line is skipped, the remaining limits are still applied
+        for line in lines:
+            line = line.split('#', 1)[0].strip()
+            if '=' not in line:
+                continue
+            key, value = (part.strip() for part in line.split('=', 1))
+            key = key.lower().replace('-', '_')
+            try:
+                if key == 'max_bandwidth':
+                    self.bandwidth.set_rate(parse_size(value))
+                elif key == 'max_iops':
+                    self.iops.set_rate(parse_rate(value))
+            except ValueError as e:
+                print(f"  ⚠ Ignoring {key} in throttle control file {self.control_file}: {e}")
+
+    def io_op(self, count=1):
+        """
+        Account for count metadata operations (stat, EXIF probe)
+        """
+        self.check_control_file()
+        self.operations += count
+        self.throttled_seconds += self.iops.consume(count)
+
+    def transfer(self, nbytes):
+        """
+        Account for nbytes of data copied
+        """
+        self.check_control_file()
+        self.bytes_transferred += nbytes
+        self.throttled_seconds += self.bandwidth.consume(nbytes)
+
+    def summary(self):
+        """
+        Throughput achieved so far against the configured budget
+        """
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        bandwidth = self.bytes_transferred / elapsed
+        iops = self.operations / elapsed
+        bandwidth_budget = f"{format_size(self.max_bandwidth)}/s" if self.max_bandwidth else "unlimited"
+        iops_budget = f"{self.max_iops:g}" if self.max_iops else "unlimited"
+        return (
+            f"Throughput: {format_size(bandwidth)}/s (budget {bandwidth_budget}), "
+            f"{iops:.1f} ops/s (budget {iops_budget}), "
+            f"throttled for {self.throttled_seconds:.1f}s"
+        )
+
+def copy_file_throttled(source_path, dest_path, throttle):
+    """
+    shutil.copy2 replacement that charges every chunk to the throttle
+    """
+    with open(source_path, 'rb') as source, open(dest_path, 'wb') as dest:
+        while True:
+            chunk = source.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            throttle.transfer(len(chunk))
+            dest.write(chunk)
+    shutil.copystat(source_path, dest_path)
+
+# ioprio_set syscall numbers per machine - the call has no libc wrapper
+IOPRIO_SET_SYSCALLS = {'x86_64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'armv7l': 314, 'ppc64le': 273}
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+
+def set_idle_priority():
+    """
+    Run the current process with idle I/O priority and lowest CPU priority
+    Returns True if the I/O priority was changed
+    """
+    try:
+        os.setpriority(os.PRIO_PROCESS, 0, 19)
+    except (AttributeError, OSError) as e:
+        print(f"  ⚠ Cannot lower CPU priority: {e}")
+    
+    syscall_number = IOPRIO_SET_SYSCALLS.get(os.uname().machine) if sys.platform.startswith('linux') else None
+    if syscall_number is None:
+        print(f"  ⚠ Idle I/O priority is only supported on Linux, using low CPU priority only")
+        return False
+    
+    try:
+        import ctypes
         
+        libc = ctypes.CDLL(None, use_errno=True)
+        ioprio = IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT
+        if libc.syscall(syscall_number, IOPRIO_WHO_PROCESS, 0, ioprio) != 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        return True
     except Exception as e:
-        return None
+        print(f"  ⚠ Cannot set idle I/O priority: {e}")
+        return False
+
+def _copy2(source_path, dest_path, throttle):
+    """
+    shutil.copy2, rate limited when a throttle is configured
+    """
+    if throttle is None:
+        shutil.copy2(source_path, dest_path)
+    else:
+        copy_file_throttled(source_path, dest_path, throttle)
 
-def copy_file_preserve_metadata(source_path, dest_path):
+def _charge_written(dest_path, throttle):
+    """
+    Charge a file written by Pillow to the throttle after the fact
+    """
+    if throttle is not None:
+        throttle.transfer(os.path.getsize(dest_path))
+
+def copy_file_preserve_metadata(source_path, dest_path, verbose=True, throttle=None):
+    """
+    Copy file while preserving all possible metadata
+    """
+    return copy_media_file(source_path, dest_path, verbose, throttle) is not None
+
+def copy_media_file(source_path, dest_path, verbose=True, throttle=None, exif_summary=None):
     """
     Copy file while preserving all possible metadata
+    Returns name of the copy method used, or None if the copy failed
+    When throttle is given, bytes written are rate limited by it
+    exif_summary is a read_exif_summary() result the caller already has; it is
+    only used for console output and read on demand when missing
     """
+    log = print if verbose else _silent
+    
+    def camera_and_location():
+        make, model, gps = exif_summary or read_exif_summary(source_path, verbose)
+        return format_camera_info(make, model), format_gps_coordinates(gps)
+    
     try:
         file_ext = os.path.splitext(source_path)[1].lower()
         
-        print(f"    📁 Copying {file_ext} file...")
+        log(f"    📁 Copying {file_ext} file...")
         
         # Dla plików MOV i GIF używamy shutil.copy2 który kopiuje metadane
         if file_ext in ['.mov', '.gif']:
-            shutil.copy2(source_path, dest_path)
-            print(f"    ✓ Copied {file_ext.upper()} with basic metadata")
-            return True
+            _copy2(source_path, dest_path, throttle)
+            log(f"    ✓ Copied {file_ext.upper()} with basic metadata")
+            return 'copy2'
         
         # For images with EXIF data (JPEG, TIFF)
         if file_ext in ['.jpg', '.jpeg', '.tiff', '.tif']:
             try:
+                from PIL import Image
+                
                 with Image.open(source_path) as img:
                     # Preserve EXIF data including GPS
                     exif_data = img.info.get('exif')
                     if exif_data:
                         # Save with original EXIF data (includes GPS)
                         img.save(dest_path, exif=exif_data)
+                        _charge_written(dest_path, throttle)
                         
                         # Display camera and GPS info if available
-                        camera_info = display_camera_info(source_path)
-                        gps_info = display_gps_info(source_path)
-                        
-                        if camera_info:
-                            print(f"    📱 Camera: {camera_info}")
-                        if gps_info:
-                            print(f"    📍 Location: {gps_info}")
-                            print(f"    ✓ Copied with EXIF metadata (including GPS)")
-                        else:
-                            print(f"    ✓ Copied with EXIF metadata")
+                        if verbose:
+                            camera_info, gps_info = camera_and_location()
+                            
+                            if camera_info:
+                                log(f"    📱 Camera: {camera_info}")
+                            if gps_info:
+                                log(f"    📍 Location: {gps_info}")
+                                log(f"    ✓ Copied with EXIF metadata (including GPS)")
+                            else:
+                                log(f"    ✓ Copied with EXIF metadata")
+                        return 'pil-exif'
                     else:
-                        shutil.copy2(source_path, dest_path)
-                        print(f"    ✓ Copied with basic metadata")
+                        _copy2(source_path, dest_path, throttle)
+                        log(f"    ✓ Copied with basic metadata")
+                        return 'copy2'
             except Exception as e:
-                print(f"    ⚠ EXIF copy failed, using basic copy: {e}")
-                shutil.copy2(source_path, dest_path)
+                log(f"    ⚠ EXIF copy failed, using basic copy: {e}")
+                _copy2(source_path, dest_path, throttle)
+                return 'copy2-fallback'
         
         # For PNG files (limited EXIF support)
         elif file_ext == '.png':
             try:
+                from PIL import Image
+                
                 with Image.open(source_path) as img:
                     # PNG has limited EXIF support, but we try to preserve what we can
                     exif_data = img.info.get('exif')
                     if exif_data:
                         img.save(dest_path, "PNG", exif=exif_data)
-                        print(f"    ✓ Copied PNG with EXIF metadata")
+                        _charge_written(dest_path, throttle)
+                        log(f"    ✓ Copied PNG with EXIF metadata")
+                        return 'pil-exif'
                     else:
                         img.save(dest_path, "PNG")
-                        print(f"    ✓ Copied PNG with basic metadata")
+                        _charge_written(dest_path, throttle)
+                        log(f"    ✓ Copied PNG with basic metadata")
+                        return 'pil'
             except Exception as e:
-                print(f"    ⚠ PNG copy failed, using basic copy: {e}")
-                shutil.copy2(source_path, dest_path)
+                log(f"    ⚠ PNG copy failed, using basic copy: {e}")
+                _copy2(source_path, dest_path, throttle)
+                return 'copy2-fallback'
         
         # For WebP files
         elif file_ext == '.webp':
             try:
+                from PIL import Image
+                
                 with Image.open(source_path) as img:
                     # WebP supports some EXIF data including GPS
                     exif_data = img.info.get('exif')
                     if exif_data:
                         img.save(dest_path, "WEBP", exif=exif_data)
+                        _charge_written(dest_path, throttle)
                         
                         # Display GPS info if available
-                        gps_info = display_gps_info(source_path)
-                        if gps_info:
-                            print(f"    📍 Location: {gps_info}")
-                            print(f"    ✓ Copied WebP with EXIF metadata (including GPS)")
-                        else:
-                            print(f"    ✓ Copied WebP with EXIF metadata")
+                        if verbose:
+                            camera_info, gps_info = camera_and_location()
+                            if gps_info:
+                                log(f"    📍 Location: {gps_info}")
+                                log(f"    ✓ Copied WebP with EXIF metadata (including GPS)")
+                            else:
+                                log(f"    ✓ Copied WebP with EXIF metadata")
+                        return 'pil-exif'
                     else:
                         img.save(dest_path, "WEBP")
-                        print(f"    ✓ Copied WebP with basic metadata")
+                        _charge_written(dest_path, throttle)
+                        log(f"    ✓ Copied WebP with basic metadata")
+                        return 'pil'
             except Exception as e:
-                print(f"    ⚠ WebP copy failed, using basic copy: {e}")
-                shutil.copy2(source_path, dest_path)
+                log(f"    ⚠ WebP copy failed, using basic copy: {e}")
+                _copy2(source_path, dest_path, throttle)
+                return 'copy2-fallback'
         
         # For HEIC files - preserve metadata if possible
         elif file_ext == '.heic':
             try:
                 # For HEIC, we use basic copy but note about GPS preservation
-                shutil.copy2(source_path, dest_path)
+                _copy2(source_path, dest_path, throttle)
                 
                 # Check if original has GPS data
-                gps_info = display_gps_info(source_path)
-                if gps_info:
-                    print(f"    📍 Location: {gps_info}")
-                    print(f"    ⚠ HEIC copied directly (GPS data should be preserved)")
-                else:
-                    print(f"    ⚠ HEIC copied directly (install pyheif for better metadata handling)")
+                if verbose:
+                    camera_info, gps_info = camera_and_location()
+                    if gps_info:
+                        log(f"    📍 Location: {gps_info}")
+                        log(f"    ⚠ HEIC copied directly (GPS data should be preserved)")
+                    else:
+                        log(f"    ⚠ HEIC copied directly (install pyheif for better metadata handling)")
+                return 'copy2'
             except Exception as e:
-                print(f"    ⚠ HEIC copy failed: {e}")
-                return False
+                log(f"    ⚠ HEIC copy failed: {e}")
+                return None
         
         # For other video files
         elif file_ext in VIDEO_EXTENSIONS:
-            shutil.copy2(source_path, dest_path)
-            print(f"    ✓ Copied video ({file_ext}) with basic metadata")
+            _copy2(source_path, dest_path, throttle)
+            log(f"    ✓ Copied video ({file_ext}) with basic metadata")
+            return 'copy2'
             
         # For other files
         else:
-            shutil.copy2(source_path, dest_path)
-            print(f"    ✓ Copied with basic metadata")
-            
-        return True
+            _copy2(source_path, dest_path, throttle)
+            log(f"    ✓ Copied with basic metadata")
+            return 'copy2'
             
     except Exception as e:
-        print(f"    ✗ Metadata copy failed: {e}")
+        log(f"    ✗ Metadata copy failed: {e}")
         # Fallback to basic copy
         try:
-            shutil.copy2(source_path, dest_path)
-            print(f"    ✓ Fallback: copied with basic metadata")
-            return True
+            _copy2(source_path, dest_path, throttle)
+            log(f"    ✓ Fallback: copied with basic metadata")
+            return 'copy2-fallback'
         except Exception as e2:
-            print(f"    ✗ Complete copy failure: {e2}")
-            return False
+            log(f"    ✗ Complete copy failure: {e2}")
+            return None
 
-def extract_datetime_from_filename(filename):
+def extract_datetime_from_filename(filename, verbose=True):
     """
     Extract datetime from filename using multiple patterns
     Returns datetime object or None if no datetime found
@@ -323,6 +646,9 @@ def extract_datetime_from_filename(filename):
     # Remove extension for matching
     name_without_ext = os.path.splitext(filename)[0]
     
+    if not verbose:
+        return _extract_datetime_quiet(name_without_ext)
+    
     print(f"  🔍 Testing filename: '{name_without_ext}'")
     
     for i, pattern in enumerate(DATE_PATTERNS):
@@ -475,6 +801,26 @@ def extract_datetime_from_filename(filename):
     print(f"  ✗ No pattern matched for filename: {name_without_ext}")
     return None
 
+def _extract_datetime_quiet(name_without_ext):
+    """
+    Same matching rules as extract_datetime_from_filename, without console output
+    Used when scanning whole directories
+    """
+    for pattern in DATE_PATTERNS:
+        match = pattern.match(name_without_ext)
+        if not match:
+            continue
+        groups = match.groups()
+        datetime_str = "".join(groups)
+        try:
+            if len(datetime_str) == 14:
+                return datetime.strptime(datetime_str, '%Y%m%d%H%M%S')
+            if len(datetime_str) == 8:
+                return datetime.strptime(datetime_str, '%Y%m%d')
+        except (ValueError, TypeError):
+            continue
+    return None
+
 def get_file_dates(file_path):
     """
     Get all available dates for a file
@@ -486,7 +832,6 @@ def get_file_dates(file_path):
     stat = os.stat(file_path)
     dates['creation'] = datetime.fromtimestamp(stat.st_ctime)
     dates['modification'] = datetime.fromtimestamp(stat.st_mtime)
-    dates['access'] = datetime.fromtimestamp(stat.st_atime)
     
     # Get datetime from filename (only for files with clear datetime patterns)
     filename_datetime = extract_datetime_from_filename(os.path.basename(file_path))
@@ -495,38 +840,381 @@ def get_file_dates(file_path):
     
     return dates
 
+def datetime_to_timestamp(date_obj):
+    """
+    Convert naive local datetime to integer epoch seconds
+    """
+    return int(time.mktime(date_obj.timetuple()))
+
+# Wall-clock seconds count from this naive datetime, without any time zone
+WALL_CLOCK_EPOCH = datetime(1970, 1, 1)
+
+def wall_clock_seconds(date_obj):
+    """
+    Naive datetime to integer seconds since WALL_CLOCK_EPOCH
+    Unlike datetime_to_timestamp this never goes through local time, so a
+    time that falls into a DST gap is kept as written
+    """
+    return (date_obj - WALL_CLOCK_EPOCH) // timedelta(seconds=1)
+
+def wall_clock_datetime(seconds):
+    """
+    Inverse of wall_clock_seconds
+    """
+    return WALL_CLOCK_EPOCH + timedelta(seconds=int(seconds))
+
+class FileRecord:
+    """
+    Compact per-file record used instead of dicts of datetime objects
+    Timestamps are integer epoch seconds, filename_ts is None when the name has no date
+    """
+    __slots__ = ('path', 'size', 'ctime', 'mtime', 'filename_ts', 'make', 'model', 'gps')
+
+    def __init__(self, path, size, ctime, mtime, filename_ts=None, make=None, model=None, gps=None):
+        self.path = path
+        self.size = size
+        self.ctime = ctime
+        self.mtime = mtime
+        self.filename_ts = filename_ts
+        self.make = make
+        self.model = model
+        self.gps = gps
+
+    def read_exif(self, verbose=True):
+        """
+        Fill make, model and gps with one filtered EXIF probe
+        """
+        self.make, self.model, self.gps = read_exif_summary(self.path, verbose)
+        return self
+
+    def exif_summary(self):
+        """
+        (make, model, gps) in the read_exif_summary() format
+        """
+        return self.make, self.model, self.gps
+
+    def __repr__(self):
+        return f"FileRecord({self.path!r}, size={self.size}, ctime={self.ctime}, mtime={self.mtime}, filename_ts={self.filename_ts})"
+
+class FileRecordBatch:
+    """
+    Columnar storage for many files: parallel arrays of size/ctime/mtime/filename date
+    Paths are split into a shared directory table and a per-file name, so memory
+    grows with the number of files and not with the length of their paths
+    The filename date is kept twice: as epoch seconds to compare with ctime/mtime,
+    and as wall_clock_seconds() so the date written in the name is reproduced exactly
+    """
+
+    def __init__(self):
+        self.directories = []
+        self._directory_ids = {}
+        self.dir_index = array('l')
+        self.names = []
+        self.size = array('q')
+        self.ctime = array('q')
+        self.mtime = array('q')
+        self.filename_ts = array('q')
+        self.filename_wall = array('q')
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, directory, name, size, ctime, mtime, filename_date=None):
+        """
+        Add one file to the batch
+        filename_date is the naive datetime parsed from the name, or None
+        """
+        dir_id = self._directory_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self.directories)
+            self.directories.append(directory)
+            self._directory_ids[directory] = dir_id
+        self.dir_index.append(dir_id)
+        self.names.append(name)
+        self.size.append(size)
+        self.ctime.append(ctime)
+        self.mtime.append(mtime)
+        if filename_date is None:
+            self.filename_ts.append(MISSING_TIMESTAMP)
+            self.filename_wall.append(MISSING_TIMESTAMP)
+        else:
+            self.filename_ts.append(datetime_to_timestamp(filename_date))
+            self.filename_wall.append(wall_clock_seconds(filename_date))
+
+    def append_path(self, file_path):
+        """
+        Stat a file and add it to the batch
+        """
+        directory, name = os.path.split(file_path)
+        stat = os.stat(file_path)
+        self.append(
+            directory,
+            name,
+            stat.st_size,
+            int(stat.st_ctime),
+            int(stat.st_mtime),
+            extract_datetime_from_filename(name, verbose=False),
+        )
+
+    def path(self, index):
+        """
+        Full path of the file at index
+        """
+        return os.path.join(self.directories[self.dir_index[index]], self.names[index])
+
+    def record(self, index, with_exif=False, verbose=True):
+        """
+        Materialise a single FileRecord from the columns
+        EXIF (make, model, gps) is probed only when with_exif is True
+        """
+        filename_ts = self.filename_ts[index]
+        record = FileRecord(
+            self.path(index),
+            self.size[index],
+            self.ctime[index],
+            self.mtime[index],
+            None if filename_ts == MISSING_TIMESTAMP else filename_ts,
+        )
+        if with_exif:
+            record.read_exif(verbose)
+        return record
+
+    def resolve_dates(self, now=None):
+        """
+        Resolve target date, source, needs-correction flag and year for every file
+        """
+        return resolve_dates_batch(self.filename_ts, self.ctime, self.mtime, now=now,
+                                   filename_wall=self.filename_wall)
+
+    def order_by_ctime(self):
+        """
+        Indices of the files sorted by creation time, as an array('q')
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            ctime = self.ctime
+            return array('q', sorted(range(len(self)), key=ctime.__getitem__))
+        
+        # Stable like sorted(), so files with equal ctime keep their scan order
+        order = np.argsort(np.frombuffer(self.ctime, dtype=np.int64), kind='stable')
+        return array('q', order.astype(np.int64).tobytes())
+
+class ExifColumns:
+    """
+    EXIF summaries of many files in the read_exif_summary() format
+    Camera (make, model) pairs are stored once in a table with an id per file,
+    GPS positions stay in a plain list as cluster_events() expects them
+    """
+
+    def __init__(self):
+        self.cameras = [(None, None)]
+        self._camera_ids = {(None, None): 0}
+        self.camera_id = array('l')
+        self.gps = []
+
+    def __len__(self):
+        return len(self.gps)
+
+    def append(self, make, model, gps):
+        camera_id = self._camera_ids.get((make, model))
+        if camera_id is None:
+            camera_id = len(self.cameras)
+            self.cameras.append((make, model))
+            self._camera_ids[(make, model)] = camera_id
+        self.camera_id.append(camera_id)
+        self.gps.append(gps)
+
+    def summary(self, index):
+        """
+        (make, model, gps) of the file at index
+        """
+        make, model = self.cameras[self.camera_id[index]]
+        return make, model, self.gps[index]
+
+# Date sources in tie-break order - on equal timestamps the earlier source wins
+DATE_SOURCES = ('filename', 'creation', 'modification')
+
+# Tolerance in seconds before a file date is considered wrong
+DATE_TOLERANCE_SECONDS = 60
+
+class BatchDateResolution:
+    """
+    Result of resolve_dates_batch - parallel arrays indexed like the input
+    source holds an index into DATE_SOURCES, or -1 when no date was available
+    filename_wall, when given, holds the wall_clock_seconds() of filename dates
+    """
+    __slots__ = ('target_ts', 'source', 'needs_correction', 'year', 'filename_wall')
+
+    def __init__(self, target_ts, source, needs_correction, year, filename_wall=None):
+        self.target_ts = target_ts
+        self.source = source
+        self.needs_correction = needs_correction
+        self.year = year
+        self.filename_wall = filename_wall
+
+    def __len__(self):
+        return len(self.target_ts)
+
+    def source_label(self, index):
+        source = int(self.source[index])
+        return DATE_SOURCES[source] if source >= 0 else None
+
+    def target_date(self, index):
+        # A filename date is returned as written, even inside a DST gap
+        if self.filename_wall is not None and self.source[index] == 0:
+            return wall_clock_datetime(self.filename_wall[index])
+        return datetime.fromtimestamp(float(self.target_ts[index]))
+
+def _local_year_starts(first_year, last_year):
+    """
+    Local-time epoch of January 1st for every year in [first_year, last_year + 1]
+    """
+    return [time.mktime((year, 1, 1, 0, 0, 0, 0, 1, -1)) for year in range(first_year, last_year + 2)]
+
+def needs_correction_batch(ctime, mtime, target_ts, tolerance=DATE_TOLERANCE_SECONDS):
+    """
+    Vectorised needs_correction over arrays of timestamps
+    Missing ctime/mtime values (MISSING_TIMESTAMP) never require correction
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        result = []
+        for c, m, t in zip(ctime, mtime, target_ts):
+            result.append(
+                (c != MISSING_TIMESTAMP and abs(c - t) > tolerance) or
+                (m != MISSING_TIMESTAMP and abs(m - t) > tolerance)
+            )
+        return result
+    
+    ctime = np.asarray(ctime, dtype=np.float64)
+    mtime = np.asarray(mtime, dtype=np.float64)
+    target_ts = np.asarray(target_ts, dtype=np.float64)
+    
+    creation_off = (ctime != MISSING_TIMESTAMP) & (np.abs(ctime - target_ts) > tolerance)
+    modification_off = (mtime != MISSING_TIMESTAMP) & (np.abs(mtime - target_ts) > tolerance)
+    return creation_off | modification_off
+
+def resolve_dates_batch(filename_ts, ctime, mtime, now=None, filename_wall=None):
+    """
+    Resolve target dates for many files at once
+    Each argument is a sequence of epoch seconds with MISSING_TIMESTAMP for absent values
+    Picks the ABSOLUTE OLDEST candidate per file, same rules as get_oldest_date,
+    and computes needs-correction flags and local year buckets in the same pass
+    filename_wall is the wall-clock form of filename_ts, used for the target date
+    and year of files dated by their name
+    """
+    if now is None:
+        now = time.time()
+    
+    try:
+        import numpy as np
+    except ImportError:
+        return _resolve_dates_python(filename_ts, ctime, mtime, now, filename_wall)
+    
+    count = len(ctime)
+    
+    # Columns in DATE_SOURCES order
+    candidates = np.vstack([
+        np.asarray(filename_ts, dtype=np.float64),
+        np.asarray(ctime, dtype=np.float64),
+        np.asarray(mtime, dtype=np.float64),
+    ])
+    present = candidates != MISSING_TIMESTAMP
+    masked = np.where(present, candidates, np.inf)
+    
+    # argmin returns the first minimum, which gives the DATE_SOURCES tie-break order
+    source = np.argmin(masked, axis=0)
+    target_ts = masked[source, np.arange(count)]
+    
+    has_date = present.any(axis=0)
+    source = np.where(has_date, source, -1)
+    target_ts = np.where(has_date, target_ts, now)
+    
+    flags = needs_correction_batch(candidates[1], candidates[2], target_ts)
+    
+    if count:
+        first_year = datetime.fromtimestamp(float(target_ts.min())).year
+        last_year = datetime.fromtimestamp(float(target_ts.max())).year
+        year_starts = np.asarray(_local_year_starts(first_year, last_year))
+        year = first_year + np.searchsorted(year_starts, target_ts, side='right') - 1
+    else:
+        year = np.zeros(0, dtype=np.int64)
+    
+    if filename_wall is not None:
+        from_filename = source == 0
+        wall_seconds = np.asarray(filename_wall, dtype=np.int64)[from_filename]
+        year[from_filename] = wall_seconds.astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64) + 1970
+    
+    # Plain arrays - indexing them one file at a time is much cheaper than NumPy scalars
+    return BatchDateResolution(
+        array('d', target_ts.astype(np.float64).tobytes()),
+        array('b', source.astype(np.int8).tobytes()),
+        array('b', flags.astype(np.int8).tobytes()),
+        array('q', year.astype(np.int64).tobytes()),
+        filename_wall,
+    )
+
+def _resolve_dates_python(filename_ts, ctime, mtime, now, filename_wall=None):
+    """
+    Pure Python fallback for resolve_dates_batch when NumPy is not installed
+    """
+    targets = []
+    sources = []
+    years = []
+    for candidates in zip(filename_ts, ctime, mtime):
+        best_source = -1
+        best_ts = None
+        for source, ts in enumerate(candidates):
+            if ts != MISSING_TIMESTAMP and (best_ts is None or ts < best_ts):
+                best_source = source
+                best_ts = ts
+        if best_ts is None:
+            best_ts = now
+        targets.append(best_ts)
+        sources.append(best_source)
+        if best_source == 0 and filename_wall is not None:
+            years.append(wall_clock_datetime(filename_wall[len(years)]).year)
+        else:
+            years.append(datetime.fromtimestamp(best_ts).year)
+    
+    flags = needs_correction_batch(ctime, mtime, targets)
+    return BatchDateResolution(targets, sources, flags, years, filename_wall)
+
+def _date_dict_timestamp(date_dict, key):
+    """
+    Epoch seconds of a date_dict entry, or MISSING_TIMESTAMP
+    """
+    date_obj = date_dict.get(key)
+    return date_obj.timestamp() if date_obj else MISSING_TIMESTAMP
+
 def get_oldest_date(date_dict):
     """
     Find the ABSOLUTE OLDEST date from all available sources:
     - filename date
     - creation date  
     - modification date
+    Thin wrapper over resolve_dates_batch for a single file
     """
-    creation = date_dict.get('creation')
-    modification = date_dict.get('modification')
-    filename_date = date_dict.get('filename')
+    resolution = resolve_dates_batch(
+        [_date_dict_timestamp(date_dict, 'filename')],
+        [_date_dict_timestamp(date_dict, 'creation')],
+        [_date_dict_timestamp(date_dict, 'modification')],
+    )
     
-    # Collect all available dates
-    all_dates = []
-    if creation:
-        all_dates.append(creation)
-    if modification:
-        all_dates.append(modification)
-    if filename_date:
-        all_dates.append(filename_date)
-    
-    if not all_dates:
+    source = resolution.source_label(0)
+    if source is None:
         return None
     
-    # Find the ABSOLUTE OLDEST date
-    oldest_date = min(all_dates)
+    oldest_date = date_dict[source]
     
     # Report which source provided the oldest date
-    if filename_date and filename_date == oldest_date:
+    if source == 'filename':
         print(f"  ✅ Using filename datetime (OLDEST: {oldest_date})")
-    elif creation and creation == oldest_date:
+    elif source == 'creation':
         print(f"  ✅ Using creation date (OLDEST: {oldest_date})")
-    elif modification and modification == oldest_date:
+    elif source == 'modification':
         print(f"  ✅ Using modification date (OLDEST: {oldest_date})")
     
     return oldest_date
@@ -535,23 +1223,23 @@ def needs_correction(date_dict, target_date):
     """
     Check if file needs date correction
     Returns True if creation or modification date differs from target date
+    Thin wrapper over needs_correction_batch for a single file
     """
-    creation = date_dict.get('creation')
-    modification = date_dict.get('modification')
-    
-    # Check if either creation or modification date differs from target date
-    if creation and abs((creation - target_date).total_seconds()) > 60:  # 1 minute tolerance
-        return True
-    if modification and abs((modification - target_date).total_seconds()) > 60:
-        return True
-    
-    return False
+    flags = needs_correction_batch(
+        [_date_dict_timestamp(date_dict, 'creation')],
+        [_date_dict_timestamp(date_dict, 'modification')],
+        [target_date.timestamp()],
+    )
+    return bool(flags[0])
 
-def correct_file_dates(file_path, target_date):
+def correct_file_dates(file_path, target_date, verbose=True):
     """
     Correct file dates to the target date
     """
+    log = print if verbose else _silent
     try:
+        import filedate
+        
         file_path_obj = filedate.File(file_path)
         file_path_obj.set(
             created=target_date,
@@ -560,13 +1248,14 @@ def correct_file_dates(file_path, target_date):
         )
         return True
     except Exception as e:
-        print(f"Error correcting dates for {file_path}: {str(e)}")
+        log(f"Error correcting dates for {file_path}: {str(e)}")
         return False
 
-def set_file_dates_manual(file_path, target_date):
+def set_file_dates_manual(file_path, target_date, verbose=True):
     """
     Manually set file dates using os.utime as fallback
     """
+    log = print if verbose else _silent
     try:
         # Convert datetime to timestamp
         timestamp = time.mktime(target_date.timetuple())
@@ -574,10 +1263,10 @@ def set_file_dates_manual(file_path, target_date):
         # Set modification and access time
         os.utime(file_path, (timestamp, timestamp))
         
-        print(f"    ✓ Manual date setting: {target_date}")
+        log(f"    ✓ Manual date setting: {target_date}")
         return True
     except Exception as e:
-        print(f"    ⚠ Manual date setting failed: {e}")
+        log(f"    ⚠ Manual date setting failed: {e}")
         return False
 
 def get_year_folder_name(target_date):
@@ -585,7 +1274,13 @@ def get_year_folder_name(target_date):
     Generate folder name in format: Photos from YYYY
     Example: Photos from 2023
     """
-    return f"Photos from {target_date.strftime('%Y')}"
+    return year_folder_name(target_date.year)
+
+def year_folder_name(year):
+    """
+    get_year_folder_name for a plain year number, e.g. BatchDateResolution.year
+    """
+    return f"Photos from {year:04d}"
 
 def generate_new_filename(file_path, target_date, file_counter):
     """
@@ -593,26 +1288,202 @@ def generate_new_filename(file_path, target_date, file_counter):
     Format: VID_YYYYMMDD_HHMMSS_counter.extension for videos
     Format: IMG_YYYYMMDD_HHMMSS_counter.extension for images
     """
+    return format_new_filename(new_filename_parts(file_path), target_date, file_counter)
+
+def new_filename_parts(file_path):
+    """
+    (prefix, lower-case extension) of the new name - depends only on the extension
+    """
     file_ext = os.path.splitext(file_path)[1].lower()
     
     # Determine prefix based on file type
     if file_ext in VIDEO_EXTENSIONS:
-        prefix = "VID"
-    else:
-        prefix = "IMG"
+        return "VID", file_ext
+    return "IMG", file_ext
+
+def format_new_filename(parts, target_date, file_counter):
+    """
+    generate_new_filename with the new_filename_parts() result already known
+    """
+    # Format: YYYYMMDD_HHMMSS, with a counter to ensure unique filenames
+    return "%s_%04d%02d%02d_%02d%02d%02d_%04d%s" % (
+        parts[0], target_date.year, target_date.month, target_date.day,
+        target_date.hour, target_date.minute, target_date.second, file_counter, parts[1],
+    )
+
+# Event grouping defaults - photos closer than this in space and time belong to one event
+EVENT_DISTANCE_KM = 25.0
+EVENT_GAP_HOURS = 6.0
+# Events with fewer files stay directly in the year folder
+EVENT_MIN_FILES = 3
+
+EARTH_RADIUS_KM = 6371.0
+# Same sphere as haversine_km, so grid rows are never shorter than the search distance
+KM_PER_DEGREE_LAT = math.radians(1) * EARTH_RADIUS_KM
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points in kilometres
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class _GeoGrid:
+    """
+    Grid spatial index with cells at least distance_km wide in both directions
+    Rows are bands of latitude; each row is split into a whole number of
+    longitude columns wide enough for its poleward edge, so cells don't shrink
+    towards the poles and column indexes wrap around at ±180°
+    """
+
+    def __init__(self, distance_km):
+        self.lat_step = distance_km / KM_PER_DEGREE_LAT
+        self._row_columns = {}
+
+    def _columns(self, row):
+        """
+        (number of columns, column width in degrees) for a row
+        """
+        columns = self._row_columns.get(row)
+        if columns is None:
+            # Use the poleward edge of the band, where a degree of longitude is shortest
+            edge = max(abs(row * self.lat_step), abs((row + 1) * self.lat_step))
+            if edge + self.lat_step >= 90.0:
+                # Close enough to the pole for points to be near each other across it
+                count = 1
+            else:
+                step = self.lat_step / math.cos(math.radians(edge))
+                count = max(1, math.floor(360.0 / step))
+            columns = (count, 360.0 / count)
+            self._row_columns[row] = columns
+        return columns
+
+    def _column(self, row, lon):
+        count, step = self._columns(row)
+        return math.floor((lon + 180.0) / step) % count
+
+    def cell(self, lat, lon):
+        row = math.floor(lat / self.lat_step)
+        return row, self._column(row, lon)
+
+    def neighbours(self, lat, lon):
+        """
+        Cells that can contain points within distance_km of (lat, lon)
+        """
+        row = math.floor(lat / self.lat_step)
+        for neighbour_row in (row - 1, row, row + 1):
+            count = self._columns(neighbour_row)[0]
+            column = self._column(neighbour_row, lon)
+            for neighbour_column in {(column - 1) % count, column, (column + 1) % count}:
+                yield neighbour_row, neighbour_column
+
+def cluster_events(timestamps, coordinates, distance_km=EVENT_DISTANCE_KM, gap_hours=EVENT_GAP_HOURS):
+    """
+    Group geotagged files into events by time and place
+    timestamps - epoch seconds per file
+    coordinates - (lat, lon) per file, or None for files without GPS
+    A file joins an event when another file of that event lies within distance_km
+    and was taken at most gap_hours earlier. Files are swept in time order and a
+    grid index keeps the points of the last gap_hours per cell, so every file only
+    checks a 3x3 neighbourhood, newest point first - near-linear time instead of
+    pairwise comparison.
+    Files without GPS join the event of the nearest geotagged file in time, if it
+    is within gap_hours.
+    Returns a list of event ids per file, -1 for files outside any event
+    """
+    gap_seconds = gap_hours * 3600.0
+    grid = _GeoGrid(distance_km)
+    # cell -> deque of (timestamp, lat, lon, event id), oldest first
+    recent_in_cell = {}
+    events = [-1] * len(timestamps)
+    event_count = 0
+    
+    geotagged = sorted((i for i, coords in enumerate(coordinates) if coords), key=timestamps.__getitem__)
     
-    # Format: YYYYMMDD_HHMMSS
-    date_part = target_date.strftime('%Y%m%d_%H%M%S')
+    for index in geotagged:
+        lat, lon = coordinates[index]
+        timestamp = timestamps[index]
+        
+        best_event = -1
+        best_time = None
+        for cell in grid.neighbours(lat, lon):
+            recent = recent_in_cell.get(cell)
+            if not recent:
+                continue
+            # Points older than the gap can't extend any event from now on
+            while recent and timestamp - recent[0][0] > gap_seconds:
+                recent.popleft()
+            for other_time, other_lat, other_lon, event in reversed(recent):
+                if best_time is not None and other_time <= best_time:
+                    break
+                if haversine_km(lat, lon, other_lat, other_lon) <= distance_km:
+                    best_event = event
+                    best_time = other_time
+                    break
+        
+        if best_event < 0:
+            best_event = event_count
+            event_count += 1
+        events[index] = best_event
+        cell = grid.cell(lat, lon)
+        if cell not in recent_in_cell:
+            recent_in_cell[cell] = collections.deque()
+        recent_in_cell[cell].append((timestamp, lat, lon, best_event))
     
-    # Add counter to ensure unique filenames
-    new_filename = f"{prefix}_{date_part}_{file_counter:04d}{file_ext}"
+    # Attach files without GPS to the closest geotagged file in time
+    if geotagged:
+        geotagged_times = [timestamps[i] for i in geotagged]
+        for index, coords in enumerate(coordinates):
+            if coords:
+                continue
+            position = bisect.bisect_left(geotagged_times, timestamps[index])
+            nearest = None
+            for candidate in (position - 1, position):
+                if 0 <= candidate < len(geotagged):
+                    delta = abs(geotagged_times[candidate] - timestamps[index])
+                    if delta <= gap_seconds and (nearest is None or delta < nearest[0]):
+                        nearest = (delta, geotagged[candidate])
+            if nearest is not None:
+                events[index] = events[nearest[1]]
     
-    return new_filename
+    return events
 
-def verify_file_dates(file_path, expected_date):
+def get_event_folder_names(events, timestamps, coordinates, min_files=EVENT_MIN_FILES):
+    """
+    Folder name for every event with at least min_files files
+    Format: YYYY-MM-DD 52.23N 21.01E (start date and average position)
+    Returns dict of event id -> folder name
+    """
+    stats = {}
+    for index, event in enumerate(events):
+        if event < 0:
+            continue
+        entry = stats.setdefault(event, [0, timestamps[index], 0.0, 0.0, 0])
+        entry[0] += 1
+        entry[1] = min(entry[1], timestamps[index])
+        if coordinates[index]:
+            entry[2] += coordinates[index][0]
+            entry[3] += coordinates[index][1]
+            entry[4] += 1
+    
+    names = {}
+    for event, (count, start, lat_sum, lon_sum, located) in stats.items():
+        if count < min_files:
+            continue
+        lat = lat_sum / located
+        lon = lon_sum / located
+        lat_dir = "N" if lat >= 0 else "S"
+        lon_dir = "E" if lon >= 0 else "W"
+        start_date = datetime.fromtimestamp(start).strftime('%Y-%m-%d')
+        names[event] = f"{start_date} {abs(lat):.2f}{lat_dir} {abs(lon):.2f}{lon_dir}"
+    return names
+
+def verify_file_dates(file_path, expected_date, verbose=True):
     """
     Verify that file dates match the expected date
     """
+    log = print if verbose else _silent
     try:
         stat = os.stat(file_path)
         creation = datetime.fromtimestamp(stat.st_ctime)
@@ -622,113 +1493,707 @@ def verify_file_dates(file_path, expected_date):
         modification_match = abs((modification - expected_date).total_seconds()) <= 60
         
         if creation_match and modification_match:
-            print(f"    ✅ Dates verified: {expected_date}")
+            log(f"    ✅ Dates verified: {expected_date}")
             return True
         else:
-            print(f"    ⚠ Date mismatch - Creation: {creation}, Modification: {modification}, Expected: {expected_date}")
+            log(f"    ⚠ Date mismatch - Creation: {creation}, Modification: {modification}, Expected: {expected_date}")
             return False
             
     except Exception as e:
-        print(f"    ⚠ Date verification failed: {e}")
+        log(f"    ⚠ Date verification failed: {e}")
         return False
 
-def process_media_file(file_path, output_base_dir, file_counter):
+class PlannedFile:
     """
-    Process a single media file - correct dates in original file and create copy with new name in year folder
+    One entry of Organizer.plan() - where a file will go and why
+    """
+    __slots__ = ('source_path', 'target_date', 'source', 'needs_correction', 'output_path', 'size',
+                 'original_ctime', 'original_mtime', 'exif_summary')
+
+    def __init__(self, source_path, target_date, source, needs_correction, output_path, size,
+                 original_ctime=None, original_mtime=None, exif_summary=None):
+        self.source_path = source_path
+        self.target_date = target_date
+        self.source = source
+        self.needs_correction = needs_correction
+        self.output_path = output_path
+        self.size = size
+        self.original_ctime = original_ctime
+        self.original_mtime = original_mtime
+        # (make, model, gps) already read during planning, if any
+        self.exif_summary = exif_summary
+
+    def __repr__(self):
+        return f"PlannedFile({self.source_path!r} -> {self.output_path!r}, source={self.source})"
+
+def _isoformat_timestamp(timestamp):
+    """
+    ISO string for epoch seconds, or None
+    """
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+class FileResult:
     """
+    Outcome of processing one file with Organizer.execute()
+    timings maps stage name to seconds spent in it
+    """
+    __slots__ = ('source_path', 'target_date', 'source', 'output_path', 'bytes',
+                 'success', 'corrected', 'copy_method', 'error', 'timings',
+                 'original_ctime', 'original_mtime')
+
+    def __init__(self, planned):
+        self.source_path = planned.source_path
+        self.target_date = planned.target_date
+        self.source = planned.source
+        self.output_path = planned.output_path
+        self.original_ctime = planned.original_ctime
+        self.original_mtime = planned.original_mtime
+        self.bytes = 0
+        self.success = False
+        self.corrected = False
+        self.copy_method = None
+        self.error = None
+        self.timings = {}
+
+    def to_dict(self):
+        """
+        Plain dictionary form, with dates as ISO strings
+        """
+        return {
+            'source_path': self.source_path,
+            'target_date': self.target_date.isoformat() if self.target_date else None,
+            'source': self.source,
+            'original_ctime': _isoformat_timestamp(self.original_ctime),
+            'original_mtime': _isoformat_timestamp(self.original_mtime),
+            'output_path': self.output_path,
+            'bytes': self.bytes,
+            'success': self.success,
+            'corrected': self.corrected,
+            'copy_method': self.copy_method,
+            'error': self.error,
+            'timings': dict(self.timings),
+        }
+
+    def __repr__(self):
+        return f"FileResult({self.source_path!r}, success={self.success}, output={self.output_path!r})"
+
+class RunReport:
+    """
+    Streaming JSONL report - one line per processed file, written as it completes,
+    and a final summary line on close()
+    Lines go through a large write buffer, so leaving the report on costs
+    little even for millions of files
+    With report_path None nothing is written, only the totals are kept
+    """
+
+    def __init__(self, report_path=None, buffer_size=1024 * 1024):
+        self.report_path = report_path
+        self._handle = None
+        if report_path:
+            import json
+            
+            # ASCII output: undecodable file names from os.walk become \udcXX escapes,
+            # so the report stays valid UTF-8 and os.fsencode() restores the original bytes
+            self._dumps = json.JSONEncoder(ensure_ascii=True, separators=(',', ':')).encode
+            self._handle = open(report_path, 'a', encoding='utf-8', buffering=buffer_size)
+        self.started = time.time()
+        self.files = 0
+        self.succeeded = 0
+        self.bytes = 0
+        self.sources = {}
+        self.year_folders = set()
+
+    def add(self, result):
+        """
+        Append one FileResult
+        """
+        if self._handle is not None:
+            record = {'type': 'file'}
+            record.update(result.to_dict())
+            self._handle.write(self._dumps(record))
+            self._handle.write('\n')
+        
+        self.files += 1
+        if result.success:
+            self.succeeded += 1
+            self.bytes += result.bytes
+            self.year_folders.add(get_year_folder_name(result.target_date))
+        source = result.source or 'now'
+        self.sources[source] = self.sources.get(source, 0) + 1
+
+    def summary(self):
+        """
+        Totals for the run so far
+        """
+        return {
+            'type': 'summary',
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'elapsed': time.time() - self.started,
+            'files': self.files,
+            'succeeded': self.succeeded,
+            'failed': self.files - self.succeeded,
+            'bytes': self.bytes,
+            'sources': dict(self.sources),
+            'year_folders': sorted(self.year_folders),
+        }
+
+    def close(self, extra=None):
+        """
+        Write the summary record and close the file
+        extra is merged into the summary
+        """
+        if self._handle is None:
+            return
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        self._handle.write(self._dumps(summary))
+        self._handle.write('\n')
+        self._handle.close()
+        self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+DURABILITY_MODES = ('none', 'batch', 'per-file')
+
+# Files written between two syncs in 'batch' durability mode
+DURABILITY_BATCH_SIZE = 100
+
+def fsync_path(path, directory=False):
+    """
+    fsync a file or directory by path
+    Directories can't be synced on Windows, this is a no-op there
+    """
+    if directory and os.name == 'nt':
+        return
+    flags = os.O_RDONLY if (directory or os.name != 'nt') else os.O_RDWR
+    fd = os.open(path, flags)
     try:
-        filename = os.path.basename(file_path)
-        file_ext = os.path.splitext(file_path)[1].lower()
-        file_type = "IMAGE" if file_ext in IMAGE_EXTENSIONS else "VIDEO"
-        
-        print(f"🎬 Processing {file_type}: {filename}")
-        
-        # Display camera and GPS info if available
-        camera_info = display_camera_info(file_path)
-        gps_info = display_gps_info(file_path)
-        
-        if camera_info:
-            print(f"  📱 Camera: {camera_info}")
-        if gps_info:
-            print(f"  📍 Location: {gps_info}")
-        
-        # Get all available dates from ORIGINAL file
-        dates = get_file_dates(file_path)
-        
-        creation = dates.get('creation')
-        modification = dates.get('modification')
-        filename_date = dates.get('filename')
-        
-        print(f"  Creation date:    {creation}")
-        print(f"  Modification date: {modification}")
-        if filename_date:
-            print(f"  Filename datetime: {filename_date}")
-        
-        # Find the ABSOLUTE OLDEST date from all sources
-        target_date = get_oldest_date(dates)
-        if not target_date:
-            print(f"  ✗ No valid target date found, using current date...")
-            target_date = datetime.now()
-        
-        print(f"  Target date:      {target_date}")
-        
-        # Check if correction is needed
-        if needs_correction(dates, target_date):
-            print(f"  ✓ Correcting dates in original file...")
-            if correct_file_dates(file_path, target_date):
-                print(f"  ✓ Dates corrected in original file")
-                # Verify the correction
-                verify_file_dates(file_path, target_date)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def partial_path(dest_path):
+    """
+    Hidden temporary name a copy is written under before it is committed
+    The extension is kept so Pillow still picks the right format
+    """
+    directory, name = os.path.split(dest_path)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(directory, f".{stem}.partial{ext}")
+
+class SyncTracker:
+    """
+    Makes written copies durable according to the durability mode:
+        none     - leave it to the page cache, files are written in place
+        per-file - fsync each copy, rename it into place and fsync its directory
+        batch    - collect copies and commit them in groups: fsync every file of
+                   the group, rename them all into place, then fsync each touched
+                   directory once
+    In per-file and batch mode copies are written under partial_path() first, so
+    after a crash a final name never points at an incomplete file
+    """
+
+    def __init__(self, mode='none', batch_size=DURABILITY_BATCH_SIZE):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"unknown durability mode: {mode}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self._pending_files = []
+        self._pending_dirs = set()
+        self._finished = []
+        self.sync_seconds = 0.0
+        self.file_syncs = 0
+        self.dir_syncs = 0
+
+    def write_path(self, dest_path):
+        """
+        Path a copy should be written to before commit()
+        """
+        return dest_path if self.mode == 'none' else partial_path(dest_path)
+
+    def directory_created(self, directory):
+        """
+        Record a new directory - its parent entry has to reach the disk too
+        Call once for every level makedirs created
+        """
+        if self.mode != 'none':
+            self._pending_dirs.add(os.path.dirname(os.path.abspath(directory)))
+            self._pending_dirs.add(os.path.abspath(directory))
+
+    def commit(self, written_path, dest_path, result):
+        """
+        Make a finished copy durable under its final name
+        result.success is set only once the copy is committed - in batch mode that
+        happens when its group is flushed. Committed or failed results are handed
+        back by take_finished()
+        """
+        if self.mode == 'none':
+            result.success = True
+            self._finished.append(result)
+            return
+        
+        if self.mode == 'per-file':
+            started = time.perf_counter()
+            try:
+                fsync_path(written_path)
+                os.replace(written_path, dest_path)
+            except OSError as e:
+                self._fail(result, written_path, e)
             else:
-                print(f"  ✗ Failed to correct dates in original file")
-                return False, file_counter
-        else:
-            print(f"  ✓ Dates are consistent, no correction needed")
+                self.file_syncs += 1
+                self._pending_dirs.add(os.path.dirname(os.path.abspath(dest_path)))
+                self._commit_dirs([result])
+            elapsed = time.perf_counter() - started
+            self.sync_seconds += elapsed
+            result.timings['sync'] = elapsed
+            self._finished.append(result)
+            return
+        
+        self._pending_files.append((written_path, dest_path, result))
+        if len(self._pending_files) >= self.batch_size:
+            self.flush()
+
+    def is_pending(self, result):
+        """
+        True while result waits in the current batch
+        """
+        return any(pending is result for _, _, pending in self._pending_files)
+
+    def take_finished(self):
+        """
+        Results committed (or failed to commit) since the last call
+        """
+        finished, self._finished = self._finished, []
+        return finished
+
+    def discard(self, written_path):
+        """
+        Remove a partial copy that will not be committed
+        """
+        if self.mode != 'none' and os.path.exists(written_path):
+            os.remove(written_path)
+
+    def _fail(self, result, written_path, error):
+        result.success = False
+        result.error = f"sync failed: {error}"
+        try:
+            self.discard(written_path)
+        except OSError:
+            pass
+
+    def _sync_dirs(self):
+        # Every directory is attempted, the first failure is raised afterwards
+        failure = None
+        for directory in sorted(self._pending_dirs):
+            try:
+                fsync_path(directory, directory=True)
+                self.dir_syncs += 1
+            except OSError as e:
+                failure = failure or e
+        self._pending_dirs.clear()
+        if failure is not None:
+            raise failure
+
+    def _commit_dirs(self, renamed):
+        # Sync the pending directories, then mark the renamed copies committed
+        try:
+            self._sync_dirs()
+        except OSError as e:
+            # The copies are in place, but their names may not survive a crash
+            for result in renamed:
+                result.error = f"directory sync failed: {e}"
+            return
+        for result in renamed:
+            result.success = True
+
+    def flush(self):
+        """
+        Commit all pending copies of the current batch
+        Failures are recorded on the affected results instead of raised
+        Returns seconds spent syncing
+        """
+        if not self._pending_files and not self._pending_dirs:
+            return 0.0
+        started = time.perf_counter()
+        group, self._pending_files = self._pending_files, []
         
-        # Create year folder
-        year_folder = get_year_folder_name(target_date)
-        year_output_dir = os.path.join(output_base_dir, year_folder)
+        synced = []
+        for written_path, dest_path, result in group:
+            try:
+                fsync_path(written_path)
+                self.file_syncs += 1
+                synced.append((written_path, dest_path, result))
+            except OSError as e:
+                self._fail(result, written_path, e)
+        
+        renamed = []
+        for written_path, dest_path, result in synced:
+            try:
+                os.replace(written_path, dest_path)
+                self._pending_dirs.add(os.path.dirname(os.path.abspath(dest_path)))
+                renamed.append(result)
+            except OSError as e:
+                self._fail(result, written_path, e)
         
-        if not os.path.exists(year_output_dir):
-            os.makedirs(year_output_dir)
-            print(f"  ✓ Created year folder: {year_folder}")
+        self._commit_dirs(renamed)
         
-        # Generate new filename for the COPY
-        new_filename = generate_new_filename(file_path, target_date, file_counter)
-        new_file_path = os.path.join(year_output_dir, new_filename)
+        elapsed = time.perf_counter() - started
+        self.sync_seconds += elapsed
+        for _, _, result in group:
+            result.timings['sync'] = elapsed / len(group)
+            self._finished.append(result)
+        return elapsed
+
+    def summary(self):
+        """
+        Sync statistics for the run report
+        """
+        return {
+            'durability': self.mode,
+            'sync_seconds': self.sync_seconds,
+            'file_syncs': self.file_syncs,
+            'dir_syncs': self.dir_syncs,
+        }
+
+class Organizer:
+    """
+    Library API for organizing media files
+    Holds configuration and caches so a long-lived process can run many jobs:
+        organizer = Organizer('/path/to/output')
+        results = organizer.run('/path/to/search')
+    Nothing is printed unless verbose is True
+    An IOThrottle limits copy bandwidth and stat/EXIF probe rate
+    A RunReport receives every FileResult as soon as it is done
+    With group_events, photos are grouped by GPS position and time into
+    event subfolders inside each year folder
+    durability is one of DURABILITY_MODES, see SyncTracker
+    """
+
+    def __init__(self, output_base_dir, verbose=False, throttle=None, report=None,
+                 group_events=False, event_distance_km=EVENT_DISTANCE_KM, event_gap_hours=EVENT_GAP_HOURS,
+                 durability='none'):
+        self.output_base_dir = output_base_dir
+        self.verbose = verbose
+        self.throttle = throttle
+        self.report = report
+        self.group_events = group_events
+        self.event_distance_km = event_distance_km
+        self.event_gap_hours = event_gap_hours
+        self.sync = SyncTracker(durability)
+        self._log = print if verbose else _silent
+        # Year folders already known to exist, so makedirs is not repeated per file
+        self._known_dirs = set()
+
+    def scan(self, search_path):
+        """
+        Find all media files under search_path
+        Returns a FileRecordBatch
+        """
+        return scan_media_batch(search_path, verbose=self.verbose, throttle=self.throttle)
+
+    def plan(self, batch, start_counter=1):
+        """
+        Decide target date and output path for every file in the batch
+        Files are ordered by current creation date and numbered from start_counter
+        Yields PlannedFile one at a time - the plan is never held in memory as a whole
+        """
+        resolution = batch.resolve_dates()
+        years = resolution.year
+        directories = [os.path.join(directory, '') for directory in batch.directories]
         
-        # Copy file with new name to year folder while preserving metadata including GPS
-        print(f"  📸 Copying with metadata preservation...")
-        success = copy_file_preserve_metadata(file_path, new_file_path)
+        events = exif = None
+        event_folders = {}
+        if self.group_events:
+            events, event_folders, exif = self._plan_events(batch, resolution)
         
-        if success:
-            # Set correct dates on the copy
-            print(f"  ⚙ Setting correct dates on copy...")
+        # Output folder per (year, event folder) and name prefix/extension per
+        # file suffix are worked out once, per file only the new name is formatted
+        output_dirs = {}
+        name_parts = {}
+        file_counter = start_counter
+        for index in batch.order_by_ctime():
+            year = years[index]
+            event_folder = event_folders.get(events[index]) if events is not None else None
+            output_dir = output_dirs.get((year, event_folder))
+            if output_dir is None:
+                output_dir = os.path.join(self.output_base_dir, year_folder_name(year))
+                if event_folder:
+                    output_dir = os.path.join(output_dir, event_folder)
+                output_dirs[(year, event_folder)] = output_dir
+            
+            name = batch.names[index]
+            suffix = name[name.rfind('.'):]
+            parts = name_parts.get(suffix)
+            if parts is None:
+                parts = name_parts[suffix] = new_filename_parts('_' + suffix)
+            target_date = resolution.target_date(index)
+            yield PlannedFile(
+                directories[batch.dir_index[index]] + name,
+                target_date,
+                resolution.source_label(index),
+                bool(resolution.needs_correction[index]),
+                output_dir + os.sep + format_new_filename(parts, target_date, file_counter),
+                batch.size[index],
+                batch.ctime[index],
+                batch.mtime[index],
+                exif.summary(index) if events is not None else None,
+            )
+            file_counter += 1
+
+    def _plan_events(self, batch, resolution):
+        """
+        Read GPS positions and cluster the batch into events
+        Returns (event id per file, dict of event id -> folder name, ExifColumns)
+        The EXIF summaries are kept so execute() doesn't probe the files again
+        """
+        exif = ExifColumns()
+        for index in range(len(batch)):
+            # Videos and other formats without EXIF are neither probed nor charged
+            if os.path.splitext(batch.names[index])[1].lower() not in EXIF_EXTENSIONS:
+                exif.append(None, None, None)
+                continue
+            if self.throttle is not None:
+                self.throttle.io_op()
+            exif.append(*batch.record(index, with_exif=True, verbose=self.verbose).exif_summary())
+        
+        timestamps = resolution.target_ts
+        events = cluster_events(timestamps, exif.gps, self.event_distance_km, self.event_gap_hours)
+        event_folders = get_event_folder_names(events, timestamps, exif.gps)
+        self._log(f"Grouped {sum(1 for c in exif.gps if c)} geotagged files into {len(event_folders)} events")
+        return array('q', events), event_folders, exif
+
+    def execute(self, planned_files):
+        """
+        Carry out a plan - correct dates on originals and create the organized copies
+        Returns list of FileResult, in the order they were committed
+        For large runs prefer execute_iter(), which keeps none of them
+        """
+        return list(self.execute_iter(planned_files))
+
+    def execute_iter(self, planned_files):
+        """
+        Same as execute(), but yields every FileResult as soon as it is final
+        Each result goes to the RunReport before it is yielded
+        """
+        # Output folders may have been removed since the last job
+        self._known_dirs.clear()
+        try:
+            for planned in planned_files:
+                result = self._execute_file(planned)
+                yield from self._report(self._take_finished(result))
+                self._log("-" * 60)
+            self.sync.flush()
+            yield from self._report(self.sync.take_finished())
+        finally:
+            # After a crash or an abandoned iteration, commit and report whatever is left of the last batch
+            self.sync.flush()
+            self._report(self.sync.take_finished())
+
+    def _take_finished(self, result):
+        # Results committed so far, plus result itself if it never reached commit()
+        finished = self.sync.take_finished()
+        if not self.sync.is_pending(result) and not any(other is result for other in finished):
+            finished.append(result)
+        return finished
+
+    def _report(self, results):
+        # Only committed or failed results - a batched copy is reported once flushed
+        if self.report is not None:
+            for result in results:
+                self.report.add(result)
+        return results
+
+    def run(self, search_path):
+        """
+        scan() + plan() + execute() in one call
+        """
+        return self.execute(self.plan(self.scan(search_path)))
+
+    def _ensure_dir(self, directory):
+        if directory in self._known_dirs:
+            return
+        if not os.path.exists(directory):
+            # makedirs may create several levels, e.g. year folder and event folder
+            missing = []
+            parent = os.path.abspath(directory)
+            while not os.path.exists(parent):
+                missing.append(parent)
+                parent = os.path.dirname(parent)
+            os.makedirs(directory, exist_ok=True)
+            for created in missing:
+                self.sync.directory_created(created)
+            self._log(f"  ✓ Created folder: {os.path.relpath(directory, self.output_base_dir)}")
+        self._known_dirs.add(directory)
+
+    def execute_file(self, planned):
+        """
+        Process a single planned file - correct dates in original file and create copy with new name in year folder
+        The copy is committed before returning, whatever the durability mode
+        """
+        result = self._execute_file(planned)
+        self.sync.flush()
+        self._report(self._take_finished(result))
+        return result
+
+    def _execute_file(self, planned):
+        # execute_file() without the final commit - in batch mode result may still be pending
+        log = self._log
+        result = FileResult(planned)
+        timings = result.timings
+        file_path = planned.source_path
+        target_date = planned.target_date
+        
+        try:
+            file_ext = os.path.splitext(file_path)[1].lower()
+            file_type = "IMAGE" if file_ext in IMAGE_EXTENSIONS else "VIDEO"
+            
+            log(f"🎬 Processing {file_type}: {os.path.basename(file_path)}")
+            
+            exif_summary = None
+            if self.verbose:
+                # Display camera and GPS info if available
+                if planned.exif_summary is not None:
+                    exif_summary = planned.exif_summary
+                else:
+                    if self.throttle is not None:
+                        self.throttle.io_op()
+                    exif_summary = read_exif_summary(file_path, self.verbose)
+                camera_info = format_camera_info(exif_summary[0], exif_summary[1])
+                gps_info = format_gps_coordinates(exif_summary[2])
+                
+                if camera_info:
+                    log(f"  📱 Camera: {camera_info}")
+                if gps_info:
+                    log(f"  📍 Location: {gps_info}")
+            
+            if planned.source:
+                log(f"  ✅ Using {planned.source} date (OLDEST: {target_date})")
+            else:
+                log(f"  ✗ No valid target date found, using current date...")
+            log(f"  Target date:      {target_date}")
             
-            # Try filedate first
-            if not correct_file_dates(new_file_path, target_date):
+            # Correct dates in the original if needed
+            started = time.perf_counter()
+            if planned.needs_correction:
+                log(f"  ✓ Correcting dates in original file...")
+                if correct_file_dates(file_path, target_date, self.verbose):
+                    log(f"  ✓ Dates corrected in original file")
+                    result.corrected = True
+                    # Verify the correction
+                    verify_file_dates(file_path, target_date, self.verbose)
+                else:
+                    log(f"  ✗ Failed to correct dates in original file")
+                    result.error = "failed to correct dates in original file"
+                    return result
+            else:
+                log(f"  ✓ Dates are consistent, no correction needed")
+            timings['correct'] = time.perf_counter() - started
+            
+            # Create year folder
+            year_output_dir = os.path.dirname(planned.output_path)
+            self._ensure_dir(year_output_dir)
+            
+            # Copy file with new name to year folder while preserving metadata including GPS
+            # (under a temporary name until committed, unless durability is 'none')
+            written_path = self.sync.write_path(planned.output_path)
+            log(f"  📸 Copying with metadata preservation...")
+            started = time.perf_counter()
+            result.copy_method = copy_media_file(file_path, written_path, self.verbose, self.throttle, exif_summary)
+            timings['copy'] = time.perf_counter() - started
+            
+            if result.copy_method is None:
+                log(f"  ✗ Failed to create copy with metadata")
+                result.error = "failed to create copy"
+                self.sync.discard(written_path)
+                return result
+            
+            # Set correct dates on the copy
+            log(f"  ⚙ Setting correct dates on copy...")
+            started = time.perf_counter()
+            if not correct_file_dates(written_path, target_date, self.verbose):
                 # Fallback to manual method
-                print(f"  ⚠ Filedate failed, using manual method...")
-                set_file_dates_manual(new_file_path, target_date)
+                log(f"  ⚠ Filedate failed, using manual method...")
+                set_file_dates_manual(written_path, target_date, self.verbose)
+            timings['set_dates'] = time.perf_counter() - started
             
             # Verify dates on the copy
-            print(f"  🔍 Verifying dates on copy...")
-            if verify_file_dates(new_file_path, target_date):
-                print(f"  ✅ Copy dates verified successfully")
+            log(f"  🔍 Verifying dates on copy...")
+            started = time.perf_counter()
+            if verify_file_dates(written_path, target_date, self.verbose):
+                log(f"  ✅ Copy dates verified successfully")
             else:
-                print(f"  ⚠ Copy date verification failed, but file was created")
+                log(f"  ⚠ Copy date verification failed, but file was created")
+            timings['verify'] = time.perf_counter() - started
             
-            print(f"  ✅ Copy created in '{year_folder}': {new_filename}")
-            return True, file_counter + 1
-        else:
-            print(f"  ✗ Failed to create copy with metadata")
-            return False, file_counter
+            result.bytes = os.path.getsize(written_path)
+            self.sync.commit(written_path, planned.output_path, result)
+            if result.success:
+                log(f"  ✅ Copy created in '{os.path.basename(year_output_dir)}': {os.path.basename(planned.output_path)}")
+            elif self.sync.is_pending(result):
+                log(f"  ⏳ Copy queued for commit in '{os.path.basename(year_output_dir)}': {os.path.basename(planned.output_path)}")
+            else:
+                log(f"  ✗ Failed to commit copy: {result.error}")
+            return result
             
-    except Exception as e:
+        except Exception as e:
+            result.error = str(e)
+            log(f"❌ Error processing {file_path}: {str(e)}")
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            return result
+
+def process_media_file(file_path, output_base_dir, file_counter):
+    """
+    Process a single media file - correct dates in original file and create copy with new name in year folder
+    Returns (success, next_file_counter)
+    """
+    try:
+        batch = FileRecordBatch()
+        batch.append_path(file_path)
+    except OSError as e:
         print(f"❌ Error processing {file_path}: {str(e)}")
-        import traceback
-        traceback.print_exc()
         return False, file_counter
+    
+    organizer = Organizer(output_base_dir, verbose=True)
+    planned = next(organizer.plan(batch, start_counter=file_counter))
+    result = organizer.execute_file(planned)
+    
+    if result.success:
+        return True, file_counter + 1
+    return False, file_counter
+
+def scan_media_batch(search_path, verbose=True, throttle=None):
+    """
+    Find all media files like find_media_files, but collect them into a FileRecordBatch
+    Each stat is charged to throttle when one is given
+    """
+    log = print if verbose else _silent
+    batch = FileRecordBatch()
+    
+    log(f"Searching for media files in: {os.path.abspath(search_path)}")
+    
+    for root, dirs, files in os.walk(search_path):
+        # Skip system directories to improve performance
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules']]
+        
+        for file in files:
+            file_ext = os.path.splitext(file)[1].lower()
+            if file_ext in ALL_EXTENSIONS:
+                try:
+                    if throttle is not None:
+                        throttle.io_op()
+                    batch.append_path(os.path.join(root, file))
+                except OSError as e:
+                    log(f"  ⚠ Cannot read {os.path.join(root, file)}: {e}")
+    
+    log(f"Found {len(batch)} media files in all directories")
+    return batch
 
 def find_media_files(search_path):
     """
@@ -753,12 +2218,36 @@ def find_media_files(search_path):
 
 def main():
     import argparse
+    import signal
+    
+    # File names that aren't valid UTF-8 must not crash console output
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(errors='backslashreplace')
     
     parser = argparse.ArgumentParser(description='Correct media file dates and create copies with standardized names organized by year')
     parser.add_argument('--path', type=str, default='.', 
                        help='Path to search for media files (default: current directory)')
     parser.add_argument('--output', type=str, required=True,
                        help='Output directory for renamed copies organized by year (required)')
+    parser.add_argument('--max-bandwidth', type=parse_size, default=0,
+                       help='Limit copy bandwidth in bytes per second, e.g. 20M (default: unlimited)')
+    parser.add_argument('--max-iops', type=parse_rate, default=0,
+                       help='Limit stat/EXIF probe operations per second (default: unlimited)')
+    parser.add_argument('--throttle-control', type=str, default=None,
+                       help='File with max_bandwidth=/max_iops= lines, re-read when it changes or on SIGHUP')
+    parser.add_argument('--idle-priority', action='store_true',
+                       help='Run with idle I/O priority and lowest CPU priority')
+    parser.add_argument('--group-events', action='store_true',
+                       help='Group geotagged photos into event subfolders inside each year folder')
+    parser.add_argument('--event-distance-km', type=float, default=EVENT_DISTANCE_KM,
+                       help=f'Maximum distance between photos of one event (default: {EVENT_DISTANCE_KM:g} km)')
+    parser.add_argument('--event-gap-hours', type=float, default=EVENT_GAP_HOURS,
+                       help=f'Maximum time gap between photos of one event (default: {EVENT_GAP_HOURS:g} h)')
+    parser.add_argument('--durability', choices=DURABILITY_MODES, default='none',
+                       help="fsync policy for copies: 'none' (page cache only), 'batch' (fsync in groups, "
+                            "one directory sync per group) or 'per-file' (default: none)")
+    parser.add_argument('--report', type=str, default=None,
+                       help='Append a JSONL record for every file and a final summary to this file')
     
     args = parser.parse_args()
     
@@ -785,35 +2274,61 @@ def main():
     print(f"Original files will be preserved with corrected dates")
     print(f"Copies with new names will be created in year folders")
     
-    # Find all media files in ALL directories
-    media_files = find_media_files(search_path)
-    
-    if not media_files:
-        print("No media files found.")
-        return
+    if args.idle_priority:
+        if set_idle_priority():
+            print(f"Running with idle I/O priority")
     
-    # Sort files by current creation date for consistent processing
-    media_files.sort(key=lambda x: os.path.getctime(x))
+    throttle = None
+    if args.max_bandwidth or args.max_iops or args.throttle_control:
+        throttle = IOThrottle(args.max_bandwidth, args.max_iops, args.throttle_control)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: throttle.request_reload())
     
-    # Process each media file
-    processed_count = 0
-    file_counter = 1
+    report = RunReport(args.report)
+    organizer = Organizer(output_base_dir, verbose=True, throttle=throttle, report=report,
+                          group_events=args.group_events,
+                          event_distance_km=args.event_distance_km,
+                          event_gap_hours=args.event_gap_hours,
+                          durability=args.durability)
     
-    for media_file in media_files:
-        success, file_counter = process_media_file(media_file, output_base_dir, file_counter)
-        if success:
-            processed_count += 1
+    try:
+        # Find all media files in ALL directories
+        batch = organizer.scan(search_path)
+        
+        if not len(batch):
+            print("No media files found.")
+            return
         
-        print("-" * 60)
+        # Plan and process each media file, ordered by current creation date
+        # Results are not kept - the report holds the totals
+        for result in organizer.execute_iter(organizer.plan(batch)):
+            pass
+    finally:
+        # Always flush the report and write its summary, even if the run crashed
+        extra = organizer.sync.summary()
+        if throttle is not None:
+            extra.update({
+                'throttle_bytes': throttle.bytes_transferred,
+                'throttle_operations': throttle.operations,
+                'throttled_seconds': throttle.throttled_seconds,
+            })
+        report.close(extra)
     
-    # List all created year folders
-    created_folders = [d for d in os.listdir(output_base_dir) if os.path.isdir(os.path.join(output_base_dir, d)) and 'Photos from' in d]
-    print(f"\nCreated {len(created_folders)} year folders:")
-    for folder in sorted(created_folders):
+    # List all year folders written in this run
+    print(f"\nCreated {len(report.year_folders)} year folders:")
+    for folder in sorted(report.year_folders):
         print(f"  - {folder}")
     
     print(f"\nProcessing completed!")
-    print(f"Successfully processed: {processed_count}/{len(media_files)} files")
+    print(f"Successfully processed: {report.succeeded}/{len(batch)} files")
+    if throttle is not None:
+        print(throttle.summary())
+    if args.durability != 'none':
+        sync = organizer.sync
+        print(f"Durability ({args.durability}): {sync.file_syncs} file syncs, {sync.dir_syncs} directory syncs, "
+              f"{sync.sync_seconds:.2f}s spent syncing")
+    if args.report:
+        print(f"Run report written to: {os.path.abspath(args.report)}")
     print(f"Original files preserved with corrected dates")
     print(f"Copies with standardized names created in: {os.path.abspath(output_base_dir)}")
     print(f"✅ DATE SYNCHRONIZATION: File dates now match the OLDEST available date")
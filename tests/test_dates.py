@@ -0,0 +1,97 @@
+import os
+import random
+import time
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def warsaw_time(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip('time.tzset is POSIX only')
+    monkeypatch.setenv('TZ', 'Europe/Warsaw')
+    time.tzset()
+    # 2023-03-26 02:30 does not exist there - clocks jump from 02:00 to 03:00
+    if time.localtime(time.mktime((2023, 3, 26, 2, 30, 0, 0, 1, -1))).tm_hour == 2:
+        pytest.skip('no time zone data for Europe/Warsaw')
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_filename_date_in_dst_gap_is_kept(tmp_path, warsaw_time):
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'IMG_20230326_023000.mp4').write_bytes(b'x')
+    organizer = main.Organizer(str(tmp_path / 'out'))
+    planned = list(organizer.plan(organizer.scan(str(source))))
+
+    assert planned[0].source == 'filename'
+    assert planned[0].target_date == main.datetime(2023, 3, 26, 2, 30)
+    assert os.path.basename(planned[0].output_path) == 'VID_20230326_023000_0001.mp4'
+
+
+def _resolution_rows():
+    missing = main.MISSING_TIMESTAMP
+    new_year = int(time.mktime((2023, 1, 1, 0, 0, 0, 0, 1, -1)))
+    rows = [
+        # Ties - the earlier DATE_SOURCES entry wins
+        (new_year, new_year, new_year + 3600),
+        (missing, new_year, new_year),
+        # Missing values
+        (missing, missing, missing),
+        (missing, missing, new_year),
+        (new_year - 7200, missing, missing),
+        # Year boundaries, in local time
+        (missing, new_year - 1, new_year + 86400),
+        (missing, new_year, new_year + 86400),
+        (new_year + 1, new_year + 30, new_year + 61),
+    ]
+    generator = random.Random(1234)
+    for _ in range(2000):
+        rows.append(tuple(
+            missing if generator.random() < 0.2 else new_year + generator.randrange(-400, 400) * 86400 // 7
+            for _ in range(3)
+        ))
+    return rows
+
+
+def test_numpy_and_python_resolution_agree():
+    np = pytest.importorskip('numpy')
+    rows = _resolution_rows()
+    filename_ts, ctime, mtime = (list(column) for column in zip(*rows))
+    filename_wall = [
+        ts if ts == main.MISSING_TIMESTAMP else main.wall_clock_seconds(main.datetime.fromtimestamp(ts))
+        for ts in filename_ts
+    ]
+    now = time.time()
+
+    vectorised = main.resolve_dates_batch(filename_ts, ctime, mtime, now=now, filename_wall=filename_wall)
+    fallback = main._resolve_dates_python(filename_ts, ctime, mtime, now, filename_wall)
+
+    assert np.array_equal(vectorised.target_ts, np.asarray(fallback.target_ts, dtype=np.float64))
+    assert vectorised.source.tolist() == fallback.source
+    assert [bool(flag) for flag in vectorised.needs_correction] == [bool(flag) for flag in fallback.needs_correction]
+    assert vectorised.year.tolist() == fallback.year
+
+
+def test_single_file_wrappers_agree_with_batch():
+    rows = _resolution_rows()
+    filename_ts, ctime, mtime = (list(column) for column in zip(*rows))
+    resolution = main._resolve_dates_python(filename_ts, ctime, mtime, time.time())
+
+    for index, row in enumerate(rows):
+        date_dict = {
+            key: main.datetime.fromtimestamp(ts)
+            for key, ts in zip(main.DATE_SOURCES, row) if ts != main.MISSING_TIMESTAMP
+        }
+        oldest = main.get_oldest_date(date_dict)
+        source = resolution.source_label(index)
+        if source is None:
+            assert oldest is None
+            continue
+        assert oldest == date_dict[source]
+        assert oldest.year == resolution.year[index]
+        assert main.needs_correction(date_dict, oldest) == bool(resolution.needs_correction[index])
@@ -0,0 +1,128 @@
+import os
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def fsync_spy(monkeypatch):
+    synced = []
+    original = main.fsync_path
+
+    def spy(path, directory=False):
+        synced.append((os.path.abspath(path), directory))
+        original(path, directory)
+
+    monkeypatch.setattr(main, 'fsync_path', spy)
+    return synced
+
+
+def _make_source(tmp_path, count=3):
+    source = tmp_path / 'source'
+    source.mkdir()
+    for index in range(count):
+        (source / f'VID_2023010{index + 1}_101010.mp4').write_bytes(b'x' * (index + 1))
+    return source
+
+
+@pytest.mark.parametrize('mode', ['batch', 'per-file'])
+def test_parents_of_all_created_directories_are_synced(tmp_path, fsync_spy, mode):
+    source = _make_source(tmp_path, 1)
+    output = tmp_path / 'out'
+    output.mkdir()
+    organizer = main.Organizer(str(output), durability=mode)
+    planned = list(organizer.plan(organizer.scan(str(source))))
+    # Simulate an event subfolder, so makedirs creates two levels at once
+    nested = os.path.join(os.path.dirname(planned[0].output_path), 'event')
+    planned[0].output_path = os.path.join(nested, os.path.basename(planned[0].output_path))
+    organizer.execute(planned)
+
+    synced_dirs = {path for path, directory in fsync_spy if directory}
+    assert str(output) in synced_dirs
+    assert os.path.dirname(nested) in synced_dirs
+    assert nested in synced_dirs
+
+
+class _ReportSpy:
+    def __init__(self, sync):
+        self.sync = sync
+        self.added = []
+
+    def add(self, result):
+        # A result may only be reported once its copy is in place
+        assert not self.sync.is_pending(result)
+        if result.success:
+            assert os.path.exists(result.output_path)
+            assert not os.path.exists(main.partial_path(result.output_path))
+        self.added.append(result)
+
+
+def test_batch_results_are_reported_after_their_group_is_committed(tmp_path):
+    source = _make_source(tmp_path)
+    output = tmp_path / 'out'
+    organizer = main.Organizer(str(output), durability='batch')
+    organizer.report = _ReportSpy(organizer.sync)
+    planned = list(organizer.plan(organizer.scan(str(source))))
+    results = organizer.execute(planned)
+
+    assert len(planned) < main.DURABILITY_BATCH_SIZE
+    assert all(result.success for result in results)
+    assert sorted(organizer.report.added, key=id) == sorted(results, key=id)
+
+
+def test_batch_flush_failures_are_recorded_on_results(tmp_path, monkeypatch):
+    source = _make_source(tmp_path)
+    output = tmp_path / 'out'
+    organizer = main.Organizer(str(output), durability='batch')
+    organizer.report = _ReportSpy(organizer.sync)
+    planned = list(organizer.plan(organizer.scan(str(source))))
+    failing = planned[1].output_path
+    original = os.replace
+
+    def replace(src, dst):
+        if dst == failing:
+            raise OSError("disk gone")
+        original(src, dst)
+
+    monkeypatch.setattr(main.os, 'replace', replace)
+    results = organizer.execute(planned)
+
+    assert len(organizer.report.added) == len(planned)
+    by_output = {result.output_path: result for result in results}
+    assert not by_output[failing].success
+    assert 'disk gone' in by_output[failing].error
+    assert not os.path.exists(main.partial_path(failing))
+    assert sum(result.success for result in results) == len(planned) - 1
+
+
+@pytest.mark.parametrize('mode', ['batch', 'per-file'])
+def test_directory_sync_failure_leaves_copy_in_place(tmp_path, monkeypatch, mode):
+    source = _make_source(tmp_path, 1)
+    organizer = main.Organizer(str(tmp_path / 'out'), durability=mode)
+    planned = list(organizer.plan(organizer.scan(str(source))))
+    original = main.fsync_path
+
+    def fsync_path(path, directory=False):
+        if directory:
+            raise OSError("no directory sync")
+        original(path, directory)
+
+    monkeypatch.setattr(main, 'fsync_path', fsync_path)
+    [result] = organizer.execute(planned)
+
+    assert not result.success
+    assert result.error == 'directory sync failed: no directory sync'
+    assert os.path.exists(result.output_path)
+
+
+def test_execute_file_commits_in_batch_mode(tmp_path):
+    source = _make_source(tmp_path, 1)
+    organizer = main.Organizer(str(tmp_path / 'out'), durability='batch')
+    organizer.report = _ReportSpy(organizer.sync)
+    planned = next(organizer.plan(organizer.scan(str(source))))
+    result = organizer.execute_file(planned)
+
+    assert result.success
+    assert os.path.exists(result.output_path)
+    assert organizer.report.added == [result]
@@ -0,0 +1,83 @@
+import math
+import os
+import random
+
+import pytest
+
+import main
+
+
+def _brute_force_misses(timestamps, coordinates, events, distance_km, gap_hours):
+    """
+    Files that started a new event although an earlier file was within reach
+    """
+    order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+    misses = 0
+    for position, index in enumerate(order):
+        earlier = order[:position]
+        reachable = any(
+            timestamps[index] - timestamps[other] <= gap_hours * 3600
+            and main.haversine_km(*coordinates[index], *coordinates[other]) <= distance_km
+            for other in earlier
+        )
+        if reachable and all(events[other] != events[index] for other in earlier):
+            misses += 1
+    return misses
+
+
+def test_points_just_inside_distance_due_north_share_event():
+    # With 111.32 km rows, the first point sits at the top of row 0 and the second lands in row 2
+    start = 0.2245
+    coordinates = [(start, 10.0), (start + math.degrees(24.99 / main.EARTH_RADIUS_KM), 10.0)]
+    assert main.haversine_km(*coordinates[0], *coordinates[1]) < 25
+    assert main.cluster_events([0, 60], coordinates, 25, 6) == [0, 0]
+
+
+def test_events_wrap_around_antimeridian():
+    coordinates = [(10.0, 179.95), (10.0, -179.95)]
+    assert main.haversine_km(*coordinates[0], *coordinates[1]) < 25
+    assert main.cluster_events([0, 60], coordinates, 25, 6) == [0, 0]
+
+
+def test_events_connect_across_the_pole():
+    coordinates = [(89.95, 0.0), (89.95, 180.0)]
+    assert main.haversine_km(*coordinates[0], *coordinates[1]) < 25
+    assert main.cluster_events([0, 60], coordinates, 25, 6) == [0, 0]
+
+
+@pytest.mark.parametrize('lat_range, lon_range', [((49, 51), (19, 21)), ((85, 90), (-180, 180)), ((-5, 5), (178, 182))])
+def test_cluster_events_matches_brute_force(lat_range, lon_range):
+    rng = random.Random(7)
+    count = 600
+    timestamps = [rng.uniform(0, 10 * 86400) for _ in range(count)]
+    coordinates = []
+    for _ in range(count):
+        lon = rng.uniform(*lon_range)
+        coordinates.append((rng.uniform(*lat_range), (lon + 180) % 360 - 180))
+    events = main.cluster_events(timestamps, coordinates, 25, 6)
+    assert _brute_force_misses(timestamps, coordinates, events, 25, 6) == 0
+
+
+def test_files_without_gps_join_nearest_event_in_time():
+    timestamps = [0, 600, 1200, 900, 10 ** 7]
+    coordinates = [(52.0, 21.0), (52.001, 21.0), (52.002, 21.0), None, None]
+    assert main.cluster_events(timestamps, coordinates) == [0, 0, 0, 0, -1]
+
+
+def test_event_planning_probes_only_exif_formats(tmp_path, monkeypatch):
+    source = tmp_path / 'source'
+    source.mkdir()
+    for name in ('IMG_20230101_101010.jpg', 'VID_20230101_101011.mp4', 'IMG_20230101_101012.heic'):
+        (source / name).write_bytes(b'x')
+    probed = []
+    monkeypatch.setattr(main, 'read_exif_summary', lambda path, verbose=True: probed.append(path) or (None, None, None))
+
+    throttle = main.IOThrottle()
+    organizer = main.Organizer(str(tmp_path / 'out'), group_events=True)
+    batch = organizer.scan(str(source))
+    organizer.throttle = throttle
+    planned = list(organizer.plan(batch))
+
+    assert len(planned) == 3
+    assert [os.path.basename(path) for path in probed] == ['IMG_20230101_101010.jpg']
+    assert throttle.operations == 1
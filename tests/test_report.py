@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+
+import pytest
+
+import main
+
+
+def _read_report(path):
+    with open(path, encoding='utf-8') as handle:
+        return [json.loads(line) for line in handle]
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='undecodable file names are POSIX only')
+def test_report_handles_undecodable_file_names(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    bad_name = os.fsdecode(b'IMG_20220101_101010_\xff.mp4')
+    (source / bad_name).write_bytes(b'x')
+    (source / 'VID_20230101_101010.mp4').write_bytes(b'y')
+
+    report_path = tmp_path / 'report.jsonl'
+    with main.RunReport(str(report_path)) as report:
+        organizer = main.Organizer(str(tmp_path / 'out'), report=report)
+        results = organizer.run(str(source))
+
+    assert all(result.success for result in results)
+    records = _read_report(report_path)
+    assert [record['type'] for record in records] == ['file', 'file', 'summary']
+    # The original bytes of the name can be recovered from the report
+    source_paths = [os.fsencode(record['source_path']) for record in records if record['type'] == 'file']
+    assert any(path.endswith(b'IMG_20220101_101010_\xff.mp4') for path in source_paths)
+    assert records[-1]['succeeded'] == 2
+
+
+def test_main_writes_summary_when_run_crashes(tmp_path, monkeypatch):
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'VID_20230101_101010.mp4').write_bytes(b'y')
+    report_path = tmp_path / 'report.jsonl'
+
+    def crash(self, planned_files):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(main.Organizer, 'execute_iter', crash)
+    monkeypatch.setattr(sys, 'argv', ['main.py', '--path', str(source), '--output', str(tmp_path / 'out'),
+                                      '--report', str(report_path)])
+    with pytest.raises(RuntimeError):
+        main.main()
+
+    records = _read_report(report_path)
+    assert records[-1]['type'] == 'summary'
+
+
+def test_results_stream_through_the_report(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    for day in range(1, 4):
+        (source / f'VID_2023010{day}_101010.mp4').write_bytes(b'y')
+
+    report = main.RunReport()
+    organizer = main.Organizer(str(tmp_path / 'out'), report=report)
+    plan = organizer.plan(organizer.scan(str(source)))
+    assert iter(plan) is plan
+
+    streamed = 0
+    for result in organizer.execute_iter(plan):
+        streamed += 1
+        # Every result is already counted by the time it is handed out
+        assert report.files == streamed
+        assert result.success
+    assert streamed == 3
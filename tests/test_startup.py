@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative `import main` time allowed by `python -X importtime`, in microseconds
+IMPORT_BUDGET_US = 50000
+
+HEAVY_MODULES = ('PIL', 'numpy', 'filedate')
+
+
+def _python_env():
+    env = dict(os.environ)
+    # Measure with bytecode cached, like a normal installed run
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def _import_time_us():
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=REPO_ROOT, env=_python_env(), capture_output=True, text=True, check=True,
+    )
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == 'main':
+            return int(parts[1])
+    raise AssertionError(f"no importtime entry for main:\n{completed.stderr}")
+
+
+def test_import_time_within_budget():
+    # First run writes the bytecode cache
+    _import_time_us()
+    best = min(_import_time_us() for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import main took {best} us, budget is {IMPORT_BUDGET_US} us"
+
+
+def test_help_does_not_load_heavy_modules():
+    script = (
+        "import json, sys\n"
+        "import main\n"
+        "sys.argv = ['main.py', '--help']\n"
+        "try:\n"
+        "    main.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"sys.stderr.write(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=REPO_ROOT, env=_python_env(), capture_output=True, text=True, check=True,
+    )
+    assert 'usage:' in completed.stdout
+    assert json.loads(completed.stderr.strip().splitlines()[-1]) == []
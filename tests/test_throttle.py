@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize('value, expected', [('0', 0), ('123', 123), ('500K', 512000), ('20MB', 20 * 1024 ** 2)])
+def test_parse_size(value, expected):
+    assert main.parse_size(value) == expected
+
+
+@pytest.mark.parametrize('value', ['-1', '-5M', 'inf', '1e400', 'nan', 'fast'])
+def test_parse_size_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        main.parse_size(value)
+
+
+@pytest.mark.parametrize('value', ['-1', 'inf', 'nan'])
+def test_parse_rate_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        main.parse_rate(value)
+
+
+def test_token_bucket_rejects_negative_rate():
+    with pytest.raises(ValueError):
+        main.TokenBucket(-2)
+
+
+def test_bad_control_file_line_is_skipped(tmp_path, capsys):
+    control_file = tmp_path / 'throttle'
+    control_file.write_text('max_iops=-2\nmax_bandwidth=inf\n')
+    throttle = main.IOThrottle(max_bandwidth=1024, max_iops=10, control_file=str(control_file))
+    assert throttle.max_bandwidth == 1024
+    assert throttle.max_iops == 10
+    assert 'Ignoring max_iops' in capsys.readouterr().out
+
+    control_file.write_text('max_iops=oops\nmax_bandwidth=2M\n')
+    throttle.request_reload()
+    throttle.io_op()
+    assert throttle.max_bandwidth == 2 * 1024 ** 2
+    assert throttle.max_iops == 10
+
+
+def test_token_bucket_limits_rate():
+    bucket = main.TokenBucket(100)
+    started = time.monotonic()
+    # The first second's worth is the burst, the rest has to wait
+    for _ in range(12):
+        bucket.consume(10)
+    assert time.monotonic() - started >= 0.18
+
+
+def test_io_op_limits_operations():
+    throttle = main.IOThrottle(max_iops=20)
+    started = time.monotonic()
+    throttle.io_op(20)
+    throttle.io_op(4)
+    assert time.monotonic() - started >= 0.18
+    assert throttle.throttled_seconds >= 0.18
+    assert throttle.operations == 24
+
+
+def test_copy_file_throttled_limits_bandwidth(tmp_path):
+    source = tmp_path / 'source.bin'
+    source.write_bytes(b'x' * (main.COPY_CHUNK_SIZE * 3 // 2))
+    throttle = main.IOThrottle(max_bandwidth=main.COPY_CHUNK_SIZE)
+    started = time.monotonic()
+    main.copy_file_throttled(str(source), str(tmp_path / 'copy.bin'), throttle)
+    # One chunk fits the burst, the remaining half chunk takes half a second
+    assert time.monotonic() - started >= 0.45
+    assert throttle.bytes_transferred == source.stat().st_size
+    assert (tmp_path / 'copy.bin').read_bytes() == source.read_bytes()